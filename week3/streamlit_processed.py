@@ -1,7 +1,13 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import pyarrow.parquet as pq
+from numba import njit
 import plotly.graph_objects as go
+import plotly.io as pio
+from plotly.subplots import make_subplots
 import os
 from datetime import datetime
 
@@ -11,76 +17,259 @@ st.set_page_config(page_title="HPC Cluster Dashboard", layout="wide")
 
 # ------------------- SETTINGS -------------------
 DOWNSAMPLE_POINTS = 1000  # max points to plot per timeseries 
-CSV_NAME = "processed_logs.csv"
-
-# ------------------- RESOLVE CSV PATH SAFELY -------------------
-def get_csv_path():
+PARQUET_NAME = "processed_logs.parquet"
+CSV_NAME = "processed_logs.csv"  # fallback when no Parquet output is available
+
+# Columns the dashboard touches; anything else in the file is never read
+USED_COLS = [
+    "timestamp",
+    "cpu_percent",
+    "node_utilization",
+    "jobs_running",
+    "jobs_queued",
+    "jobs_held",
+    "jobs_exiting",
+    "nodes_running",
+    "nodes_offline",
+    "nodes_down",
+    "nodes_idle",
+    "nodes_total",
+]
+
+FLOAT32_COLS = ["cpu_percent", "node_utilization"]
+COUNT_COLS = [
+    "jobs_running", "jobs_queued", "jobs_held", "jobs_exiting",
+    "nodes_running", "nodes_offline", "nodes_down", "nodes_idle", "nodes_total",
+]
+
+# Narrow types for the CSV fallback so parsing never goes through int64/float64
+CSV_COLUMN_TYPES = {
+    "timestamp": pa.timestamp("ns"),
+    "cpu_percent": pa.float32(),
+    "node_utilization": pa.float32(),
+    "jobs_running": pa.int32(),
+    "jobs_queued": pa.int32(),
+    "jobs_held": pa.float32(),
+    "jobs_exiting": pa.float32(),
+    "nodes_running": pa.int16(),
+    "nodes_offline": pa.int16(),
+    "nodes_down": pa.int16(),
+    "nodes_idle": pa.int16(),
+    "nodes_total": pa.int16(),
+}
+
+# ------------------- RESOLVE DATA PATH SAFELY -------------------
+def get_data_path():
+    """Return the processed dataset path, preferring Parquet over CSV."""
     script_dir = os.path.dirname(os.path.abspath(__file__))
-    candidates = [
-        os.path.join(script_dir, CSV_NAME),
-        os.path.normpath(os.path.join(script_dir, "..", CSV_NAME)),
-        os.path.join(os.getcwd(), CSV_NAME),
+    folders = [
+        script_dir,
+        os.path.normpath(os.path.join(script_dir, "..")),
+        os.getcwd(),
     ]
-    for p in candidates:
-        if os.path.exists(p):
-            return p
+    for name in (PARQUET_NAME, CSV_NAME):
+        for folder in folders:
+            p = os.path.join(folder, name)
+            if os.path.exists(p):
+                return p
     st.error(
-        " **processed_logs.csv not found!**\n\n"
+        " **processed_logs.parquet / processed_logs.csv not found!**\n\n"
         "Looked in script folder, parent folder, and current working directory.\n\n"
-        "Place `processed_logs.csv` next to this script or upload it in your deployment."
+        "Run `processed_logs.py` or place `processed_logs.csv` next to this script."
     )
     st.stop()
 
 # ------------------- LOAD DATA -------------------
-@st.cache_data(ttl=300, show_spinner=False)
-def load_data(csv_path: str):
-    # parse_dates speeds up timestamp conversion; infer_datetime_format helps further
-    try:
-        df = pd.read_csv(
-            csv_path,
-            parse_dates=["timestamp"],
-            infer_datetime_format=True,
-            low_memory=True
+# cache_resource hands every rerun the same DataFrame object instead of
+# hashing + unpickling a copy; callers must treat it as read-only.
+# Keyed on the file's mtime instead of a TTL: the data is only re-read when
+# processed_logs.py writes a new file, and the previous version is evicted.
+@st.cache_resource(max_entries=2, show_spinner=False)
+def load_data(data_path: str, mtime: float):
+    if data_path.endswith(".parquet"):
+        # typed columnar read: no tokenizing, no datetime parsing, only used columns
+        available = pq.read_schema(data_path).names
+        df = pd.read_parquet(
+            data_path,
+            columns=[c for c in USED_COLS if c in available],
+            engine="pyarrow"
         )
-    except Exception as e:
-        # Fall back to safe load + conversion
-        df = pd.read_csv(csv_path, low_memory=True)
-        df["timestamp"] = pd.to_datetime(df.get("timestamp"), errors="coerce", infer_datetime_format=True)
+    else:
+        # multi-threaded Arrow CSV parse: typed columns, timestamps parsed during the read
+        with open(data_path, encoding="utf-8-sig") as f:
+            header = f.readline().strip().split(",")
+        columns = [c for c in USED_COLS if c in header]
+        try:
+            table = pacsv.read_csv(
+                data_path,
+                read_options=pacsv.ReadOptions(use_threads=True),
+                convert_options=pacsv.ConvertOptions(
+                    include_columns=columns,
+                    column_types={c: CSV_COLUMN_TYPES[c] for c in columns},
+                    timestamp_parsers=[pacsv.ISO8601, "%Y-%m-%d %H:%M:%S"],
+                ),
+            )
+            df = table.to_pandas(self_destruct=True)
+            del table
+        except pa.ArrowInvalid:
+            # Fall back to a lenient load that drops unparseable timestamps
+            df = pd.read_csv(data_path, usecols=columns, low_memory=True)
+            df["timestamp"] = pd.to_datetime(df.get("timestamp"), errors="coerce")
 
     # basic validation
     if "timestamp" not in df.columns:
-        raise ValueError("CSV must contain a 'timestamp' column.")
-    df = df.dropna(subset=["timestamp"]).sort_values("timestamp").reset_index(drop=True)
+        raise ValueError("Data must contain a 'timestamp' column.")
+    df = df.dropna(subset=["timestamp"])
+    # Downcast anything still wide (older Parquet files, the lenient CSV retry):
+    # percentages to float32, counts to the smallest integer type that holds
+    # their range (to_numeric keeps the type if the values don't fit), NaN-holding
+    # counts to float32
+    for c in df.columns.intersection(FLOAT32_COLS):
+        if df[c].dtype != np.float32:
+            df[c] = df[c].astype(np.float32)
+    for c in df.columns.intersection(COUNT_COLS):
+        if pd.api.types.is_integer_dtype(df[c]):
+            df[c] = pd.to_numeric(df[c], downcast="integer")
+        elif df[c].dtype != np.float32:
+            df[c] = df[c].astype(np.float32)
+    # plots and slicing work on int64 ns (only the CSV fallback or older Parquet
+    # files written at microsecond precision need converting)
+    if df["timestamp"].dtype != "datetime64[ns]":
+        df["timestamp"] = df["timestamp"].astype("datetime64[ns]")
+    # processed_logs.py writes rows already sorted; only sort data that isn't
+    if not df["timestamp"].is_monotonic_increasing:
+        df = df.sort_values("timestamp")
+    df = df.reset_index(drop=True)
     # set index for fast time slicing; keep timestamp column too for compatibility
-    df.index = pd.DatetimeIndex(df["timestamp"])
+    # (ns unit so asi8 can be searched with Timestamp.value bounds)
+    df.index = pd.DatetimeIndex(df["timestamp"]).as_unit("ns")
+    # derived once per load (before the frame is shared); filter slices then carry it
+    efficiency = compute_efficiency(df)
+    if efficiency is not None:
+        df["efficiency"] = efficiency
     return df
 
+@st.cache_resource(max_entries=2, show_spinner=False)
+def load_rollups(df_key: str, _df: pd.DataFrame):
+    """Hourly and daily means of the numeric columns, for charts over long ranges.
+
+    When a rollup slice still has more rows than the plot budget, per-sample
+    detail is below pixel resolution, so the charts read ~12x (hourly) /
+    ~288x (daily) fewer rows than the raw data.
+    """
+    numeric = _df.drop(columns="timestamp")
+    rollups = {}
+    for freq in ("1h", "1D"):
+        r = numeric.resample(freq).mean().dropna(how="all").astype(np.float32)
+        r.insert(0, "timestamp", r.index)
+        rollups[freq] = r
+    return rollups
+
 # ------------------- UTILS -------------------
-def downsample_df(df: pd.DataFrame, max_points: int = DOWNSAMPLE_POINTS):
-    """Return a downsampled DataFrame keeping first+last and evenly spaced intermediate rows."""
-    n = len(df)
-    if n <= max_points:
-        return df
-    # include first and last always
-    idx = np.linspace(0, n - 1, num=max_points, dtype=int)
-    return df.iloc[idx]
-
-@st.cache_data(ttl=300)
+@st.cache_data(show_spinner=False)
+def build_date_index(df_key: str, _ts_ns: np.ndarray):
+    """Return {year: {month: [days]}} for the sidebar from a sorted int64 ns array.
+
+    Only per-day boundaries are searched (O(days · log N)), so no per-row
+    year/month/day arrays are built. `_ts_ns` is not hashed by Streamlit;
+    `df_key` identifies the loaded dataset.
+    """
+    day_starts = pd.date_range(
+        pd.Timestamp(_ts_ns[0]).normalize(), pd.Timestamp(_ts_ns[-1]).normalize(), freq="D"
+    ).as_unit("ns")
+    bounds = np.searchsorted(_ts_ns, np.append(day_starts.asi8, _ts_ns[-1] + 1))
+    present = day_starts[np.diff(bounds) > 0]
+    date_index = {}
+    for y, m, d in zip(present.year, present.month, present.day):
+        date_index.setdefault(int(y), {}).setdefault(int(m), []).append(int(d))
+    return date_index
+
+def time_slice_bounds(ts_ns: np.ndarray, year: int, month=None, day=None):
+    """Return (start, stop) row positions of a year/month/day in a sorted int64 ns array."""
+    lo = pd.Timestamp(year=year, month=month or 1, day=day or 1)
+    if day is not None:
+        hi = lo + pd.DateOffset(days=1)
+    elif month is not None:
+        hi = lo + pd.DateOffset(months=1)
+    else:
+        hi = lo + pd.DateOffset(years=1)
+    i0, i1 = np.searchsorted(ts_ns, [lo.value, hi.value])
+    return int(i0), int(i1)
+
+@njit(cache=True)
+def lttb_indices(ts_ns, y, n_out):
+    """Largest-Triangle-Three-Buckets: indices of n_out points that keep the visual
+    shape (peaks/dips) of y over ts_ns. First and last points are always kept.
+
+    NaN values (gaps) are skipped in the bucket averages and as candidates, and a
+    NaN anchor is replaced by the last finite one, so gaps don't disable the pick.
+    """
+    n = len(ts_ns)
+    if n <= n_out or n_out < 3:
+        return np.arange(n)
+    out = np.empty(n_out, dtype=np.int64)
+    out[0] = 0
+    out[n_out - 1] = n - 1
+    t0 = ts_ns[0]
+    every = (n - 2) / (n_out - 2)
+    a = 0
+    ay = y[0]
+    for i in range(n_out - 2):
+        # average point of the next bucket (finite values only)
+        nxt_start = int((i + 1) * every) + 1
+        nxt_end = min(int((i + 2) * every) + 1, n)
+        avg_x = 0.0
+        avg_y = 0.0
+        cnt = 0
+        for j in range(nxt_start, nxt_end):
+            if not np.isnan(y[j]):
+                avg_x += ts_ns[j] - t0
+                avg_y += y[j]
+                cnt += 1
+        # anchor: the previously selected point, or the last finite one before it
+        if not np.isnan(y[a]):
+            ay = y[a]
+        if cnt > 0:
+            avg_x /= cnt
+            avg_y /= cnt
+        else:
+            # all-NaN next bucket: aim at its middle, level with the anchor
+            avg_x = 0.5 * ((ts_ns[nxt_start] - t0) + (ts_ns[nxt_end - 1] - t0))
+            avg_y = ay
+        if np.isnan(ay):
+            ay = avg_y  # no finite anchor yet (leading gap)
+        # point of the current bucket forming the largest triangle with a and the average
+        start = int(i * every) + 1
+        end = int((i + 1) * every) + 1
+        ax = float(ts_ns[a] - t0)
+        max_area = -1.0
+        max_idx = start
+        for j in range(start, end):
+            if np.isnan(y[j]):
+                continue
+            area = abs((ax - avg_x) * (y[j] - ay) - (ax - (ts_ns[j] - t0)) * (avg_y - ay))
+            if area > max_area:
+                max_area = area
+                max_idx = j
+        out[i + 1] = max_idx
+        a = max_idx
+    return out
+
 def compute_efficiency(df: pd.DataFrame):
-    # Vectorized efficiency computation if columns exist
-    if ("cpu_percent" in df.columns) and ("node_utilization" in df.columns):
-        # avoid modifying original by returning an assigned copy
-        return df.assign(efficiency=(df["cpu_percent"] * df["node_utilization"]) / 100.0)
-    return df
+    """Return cpu_percent × node_utilization / 100 as a float32 array (None if columns are missing)."""
+    if ("cpu_percent" not in df.columns) or ("node_utilization" not in df.columns):
+        return None
+    eff = np.multiply(df["cpu_percent"].to_numpy(), df["node_utilization"].to_numpy(), dtype=np.float32)
+    eff *= np.float32(0.01)
+    return eff
+
+def last_two_rows(df: pd.DataFrame, columns: list):
+    """Return (last, previous) values of `columns` as float arrays in one slice.
 
-def safe_last_two(series: pd.Series):
-    """Return last and previous value (or (last, last) if only one) safely and fast."""
-    if series is None or len(series) == 0:
-        return 0.0, 0.0
-    if len(series) == 1:
-        v = float(series.iloc[-1])
-        return v, v
-    return float(series.iloc[-1]), float(series.iloc[-2])
+    previous == last when there is only one row; missing columns read as 0.
+    """
+    arr = df.iloc[-2:].reindex(columns=columns, fill_value=0).to_numpy(dtype=np.float64)
+    return arr[-1], arr[0]
 
 def format_metric_value(val, unit=""):
     # round integers without unnecessary decimals
@@ -92,33 +281,88 @@ def format_metric_value(val, unit=""):
 
 # ------------------- PLOTTING -------------------
 PLOT_CONFIG = {"displayModeBar": False}
-
-def plot_timeseries(data: pd.DataFrame, columns: list, title: str):
-    if data.empty:
-        st.info("No data to display.")
-        return
-    # Downsample before plotting to keep interactive fast
-    ds = downsample_df(data, DOWNSAMPLE_POINTS)
-    fig = go.Figure()
-    for col in columns:
-        if col in ds.columns:
-            fig.add_trace(go.Scatter(
-                x=ds["timestamp"],
-                y=ds[col],
+# Static layout pieces, built once at import (Plotly copies them into each figure)
+TS_PANEL_HEIGHT = 320  # px per time-series subplot
+TS_LAYOUT = dict(
+    hovermode="x unified",
+    template="plotly_white",
+    legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
+)
+GAUGE_SPEC = {'axis': {'range': [0, 100]},
+              'bar': {'color': "#3366CC"},
+              'steps': [
+                  {'range': [0, 50], 'color': "lightgreen"},
+                  {'range': [50, 80], 'color': "yellow"},
+                  {'range': [80, 100], 'color': "red"}]}
+GAUGE_LAYOUT = dict(height=300)
+# st.plotly_chart serializes through plotly.io.to_json; orjson encodes numpy arrays in C
+pio.json.config.default_engine = "orjson"
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def make_timeseries_fig(panels: tuple):
+    """Build one WebGL figure with a subplot per panel on a shared time axis.
+
+    A single figure means a single WebGL context in the browser and synced
+    pan/zoom across panels. `panels` is a tuple of (title, series) where
+    `series` is a tuple of (column, timestamp bytes, value dtype string,
+    value bytes) -- raw buffers keep Streamlit's hashing cheap.
+    """
+    fig = make_subplots(
+        rows=len(panels), cols=1, shared_xaxes=True, vertical_spacing=0.08,
+        subplot_titles=[title for title, _ in panels]
+    )
+    for row, (title, series) in enumerate(panels, start=1):
+        # build the panel's traces first and add them in one go (one validation pass)
+        traces = [
+            go.Scattergl(
+                x=np.frombuffer(ts_bytes, dtype=np.int64) // 1_000_000,  # epoch ms, no datetime -> ISO string pass
+                y=np.frombuffer(y_bytes, dtype=dtype),
                 mode="lines",  # lines only -> faster rendering
                 name=col.replace("_", " ").title(),
+                legendgroup=title,
+                legendgrouptitle_text=title,
                 line=dict(width=2),
                 hovertemplate=None
-            ))
-    fig.update_layout(
-        title=title,
-        xaxis_title="Time",
-        yaxis_title="Value",
-        hovermode="x unified",
-        template="plotly_white",
-        height=420,
-        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
-    )
+            )
+            for col, ts_bytes, dtype, y_bytes in series
+        ]
+        fig.add_traces(traces, rows=row, cols=1)
+    fig.update_layout(TS_LAYOUT, height=TS_PANEL_HEIGHT * len(panels))
+    fig.update_xaxes(type="date")
+    fig.update_xaxes(title_text="Time", row=len(panels), col=1)
+    return fig
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def downsample_indices(slice_key: tuple, name: str, _ts_ns: np.ndarray, _y: np.ndarray):
+    """LTTB indices for one series of the current filter slice.
+
+    Computed once per (slice, series) and reused on every rerun with the same
+    filters; the arrays themselves are not hashed.
+    """
+    return lttb_indices(_ts_ns, _y.astype(np.float64, copy=False), DOWNSAMPLE_POINTS)
+
+def plot_timeseries_panels(data: pd.DataFrame, panels: list, slice_key: tuple):
+    """Plot [(title, columns), ...] from `data` as stacked subplots of one figure,
+    LTTB-downsampling each series. Panels with none of their columns are skipped."""
+    if data.empty:
+        st.info("No data to display.")
+        return
+    ts = data["timestamp"].to_numpy()
+    ts_ns = ts.view("int64")
+    fig_panels = []
+    for title, columns in panels:
+        series = []
+        for col in columns:
+            if col in data.columns:
+                y = data[col].to_numpy()
+                idx = downsample_indices(slice_key, col, ts_ns, y)
+                series.append((col, ts[idx].tobytes(), y.dtype.str, y[idx].tobytes()))
+        if series:
+            fig_panels.append((title, tuple(series)))
+    if not fig_panels:
+        st.info("No data to display.")
+        return
+    fig = make_timeseries_fig(tuple(fig_panels))
     st.plotly_chart(fig, use_container_width=True, config=PLOT_CONFIG)
 
 def plot_gauge(value, reference, title_text):
@@ -126,23 +370,18 @@ def plot_gauge(value, reference, title_text):
         mode="gauge+number+delta",
         value=value,
         delta={'reference': reference},
-        gauge={'axis': {'range': [0, 100]},
-               'bar': {'color': "#3366CC"},
-               'steps': [
-                   {'range': [0, 50], 'color': "lightgreen"},
-                   {'range': [50, 80], 'color': "yellow"},
-                   {'range': [80, 100], 'color': "red"}]},
+        gauge=GAUGE_SPEC,
         title={'text': title_text}
-    ))
-    fig.update_layout(height=300)
+    ), layout=GAUGE_LAYOUT)
     return fig
 
 # ------------------- MAIN -------------------
-csv_path = get_csv_path()
+data_path = get_data_path()
 try:
-    df = load_data(csv_path)
+    data_mtime = os.path.getmtime(data_path)
+    df = load_data(data_path, data_mtime)
 except Exception as e:
-    st.error(f"Failed to load CSV: {e}")
+    st.error(f"Failed to load data: {e}")
     st.stop()
 
 # Sidebar filters (compute options once)
@@ -153,42 +392,65 @@ with st.sidebar:
     if df.empty:
         st.warning("No data available")
         st.stop()
-    # get unique year/month/day strings quickly from index (fast because index is DatetimeIndex)
-    years = sorted({str(y) for y in df.index.year}, reverse=True)
+    # year/month/day options come from the cached date index, not from re-masking df
+    df_key = f"{data_path}:{data_mtime}:{len(df)}:{df.index[0].value}:{df.index[-1].value}"
+    date_index = build_date_index(df_key, df.index.asi8)
+    years = [str(y) for y in sorted(date_index, reverse=True)]
     selected_year = st.selectbox("Year", options=["All"] + years, index=0)
 
     selected_month = "All"
     selected_day = "All"
 
     if selected_year != "All":
-        # filter by year using boolean mask (fast)
         year_int = int(selected_year)
-        months = sorted({m for m in df.index[df.index.year == year_int].month})
-        months_str = [f"{m:02d}" for m in months]
+        months_str = [f"{m:02d}" for m in date_index[year_int]]
         selected_month = st.selectbox("Month", options=["All"] + months_str, index=0)
 
         if selected_month != "All":
             month_int = int(selected_month)
-            days = sorted({d for d in df.index[(df.index.year == year_int) & (df.index.month == month_int)].day})
-            days_str = [f"{d:02d}" for d in days]
+            days_str = [f"{d:02d}" for d in date_index[year_int][month_int]]
             selected_day = st.selectbox("Day", options=["All"] + days_str, index=0)
 
-# Apply filters using fast boolean masks (no copies unless necessary)
-mask = np.ones(len(df), dtype=bool)
+# Apply filters as one contiguous slice: df is sorted, so a year/month/day
+# selection is a [start, stop) range found by binary search (no boolean masks)
 if selected_year != "All":
-    mask &= (df.index.year == int(selected_year))
-if selected_month != "All":
-    mask &= (df.index.month == int(selected_month))
-if selected_day != "All":
-    mask &= (df.index.day == int(selected_day))
-
-filtered_df = df.loc[mask]
+    i0, i1 = time_slice_bounds(
+        df.index.asi8,
+        int(selected_year),
+        None if selected_month == "All" else int(selected_month),
+        None if selected_day == "All" else int(selected_day),
+    )
+else:
+    i0, i1 = 0, len(df)
+filtered_df = df.iloc[i0:i1]
 if filtered_df.empty:
     st.warning("No data matches the selected filters.")
     st.stop()
 
-# Compute derived columns cached
-filtered_df = compute_efficiency(filtered_df)
+# Charts read the coarsest source that still has >= DOWNSAMPLE_POINTS rows for
+# the selection (daily, then hourly means), else the raw samples; small slices
+# are always plotted raw
+chart_level, chart_df = "raw", filtered_df
+r0, r1 = i0, i1
+if i1 - i0 > DOWNSAMPLE_POINTS:
+    rollups = load_rollups(df_key, df)
+    for level in ("1D", "1h"):
+        rollup = rollups[level]
+        if selected_year != "All":
+            lo, hi = time_slice_bounds(
+                rollup.index.asi8,
+                int(selected_year),
+                None if selected_month == "All" else int(selected_month),
+                None if selected_day == "All" else int(selected_day),
+            )
+        else:
+            lo, hi = 0, len(rollup)
+        if hi - lo >= DOWNSAMPLE_POINTS:
+            chart_level, chart_df = level, rollup.iloc[lo:hi]
+            r0, r1 = lo, hi
+            break
+# identifies the chart source slice for the per-series downsampling cache
+slice_key = (df_key, chart_level, r0, r1)
 
 # Header summary
 start_ts = filtered_df["timestamp"].min()
@@ -196,72 +458,57 @@ end_ts = filtered_df["timestamp"].max()
 st.title(" HPC Cluster Resource Monitoring Dashboard")
 st.markdown(f"**Data range:** {start_ts.strftime('%Y-%m-%d %H:%M')} → {end_ts.strftime('%Y-%m-%d %H:%M')} | **Filtered:** {len(filtered_df):,} rows")
 
-# Latest metrics row (vectorized access)
+# Latest metrics row (vectorized access: one slice of the last two rows)
 st.subheader(" Latest Snapshot")
-c1, c2, c3, c4 = st.columns(4)
-
-latest_row = filtered_df.iloc[-1]
-
-# CPU
-cpu_last, cpu_prev = safe_last_two(filtered_df.get("cpu_percent"))
-cpu_delta = cpu_last - cpu_prev
-cpu_pct_str = f"{(cpu_delta / cpu_prev * 100):+.1f}%" if cpu_prev != 0 else "+0.0%"
-
-# Node
-node_last, node_prev = safe_last_two(filtered_df.get("node_utilization"))
-node_delta = node_last - node_prev
-node_pct_str = f"{(node_delta / node_prev * 100):+.1f}%" if node_prev != 0 else "+0.0%"
 
-# Jobs running
-run_last, run_prev = safe_last_two(filtered_df.get("jobs_running"))
-run_delta = run_last - run_prev
-run_pct_str = f"{(run_delta / run_prev * 100):+.1f}%" if run_prev != 0 else "+0.0%"
-
-# Jobs queued
-que_last, que_prev = safe_last_two(filtered_df.get("jobs_queued"))
-que_delta = que_last - que_prev
-que_pct_str = f"{(que_delta / que_prev * 100):+.1f}%" if que_prev != 0 else "+0.0%"
+SNAPSHOT_METRICS = [
+    # (column, title, unit)
+    ("cpu_percent", "CPU Usage", "%"),
+    ("node_utilization", "Node Utilization", "%"),
+    ("jobs_running", "Jobs Running", ""),
+    ("jobs_queued", "Jobs Queued", ""),
+]
+last_vals, prev_vals = last_two_rows(filtered_df, [m[0] for m in SNAPSHOT_METRICS])
+deltas = last_vals - prev_vals
+with np.errstate(divide="ignore", invalid="ignore"):
+    delta_pcts = np.where(prev_vals != 0, deltas / prev_vals * 100, 0.0)
 
 def display_metric(col, title, val, delta, delta_pct, unit=""):
     with col:
-        st.metric(label=title, value=format_metric_value(val, unit), delta=f"{delta:+,.0f} ({delta_pct})")
+        st.metric(label=title, value=format_metric_value(val, unit), delta=f"{delta:+,.0f} ({delta_pct:+.1f}%)")
 
-display_metric(c1, "CPU Usage", cpu_last, cpu_delta, cpu_pct_str, "%")
-display_metric(c2, "Node Utilization", node_last, node_delta, node_pct_str, "%")
-display_metric(c3, "Jobs Running", run_last, run_delta, run_pct_str)
-display_metric(c4, "Jobs Queued", que_last, que_delta, que_pct_str)
+for col, (_, title, unit), val, delta, delta_pct in zip(
+    st.columns(len(SNAPSHOT_METRICS)), SNAPSHOT_METRICS, last_vals, deltas, delta_pcts
+):
+    display_metric(col, title, val, delta, delta_pct, unit)
 
-# Gauges (use smaller snapshot references if not available)
+# Gauges (reference is the previous sample, 0 if there is only one)
 st.subheader(" Current Utilization Gauges")
 g1, g2 = st.columns(2)
+has_prev = len(filtered_df) > 1
 
 with g1:
-    ref = float(filtered_df["cpu_percent"].iloc[-2]) if len(filtered_df) > 1 and "cpu_percent" in filtered_df.columns else 0.0
-    fig_cpu = plot_gauge(cpu_last, ref, "CPU Utilization %")
+    fig_cpu = plot_gauge(last_vals[0], prev_vals[0] if has_prev else 0.0, "CPU Utilization %")
     st.plotly_chart(fig_cpu, use_container_width=True, config=PLOT_CONFIG)
 
 with g2:
-    ref_node = float(filtered_df["node_utilization"].iloc[-2]) if len(filtered_df) > 1 and "node_utilization" in filtered_df.columns else 0.0
-    fig_node = plot_gauge(node_last, ref_node, "Node Utilization %")
+    fig_node = plot_gauge(last_vals[1], prev_vals[1] if has_prev else 0.0, "Node Utilization %")
     st.plotly_chart(fig_node, use_container_width=True, config=PLOT_CONFIG)
 
-# Time Series Charts (downsampled inside function)
-st.subheader(" Job Queue Trends")
-plot_timeseries(filtered_df, ["jobs_running", "jobs_queued", "jobs_held", "jobs_exiting"], "Jobs Over Time")
-
-st.subheader(" Node States")
-plot_timeseries(filtered_df, ["nodes_running", "nodes_offline", "nodes_down", "nodes_idle", "nodes_total"], "Node States Over Time")
-
-st.subheader(" Efficiency Trend")
-if "efficiency" in filtered_df.columns:
-    plot_timeseries(filtered_df, ["efficiency"], "Cluster Efficiency (CPU × Node Util)")
+# Time Series Charts (one figure, downsampled inside function)
+st.subheader(" Cluster Trends")
+plot_timeseries_panels(chart_df, [
+    ("Jobs Over Time", ["jobs_running", "jobs_queued", "jobs_held", "jobs_exiting"]),
+    ("Node States Over Time", ["nodes_running", "nodes_offline", "nodes_down", "nodes_idle", "nodes_total"]),
+    ("Cluster Efficiency (CPU × Node Util)", ["efficiency"]),
+], slice_key)
 
 #System stats
 def get_log_path(filename="cluster.log"):
     """
-    Returns the path of a .log file located in the same directory as processed_logs.csv
+    Returns the path of a .log file located in the same directory as the processed dataset
     """
-    base_path = os.path.dirname(get_csv_path())  # reuse your existing function
+    base_path = os.path.dirname(get_data_path())  # reuse your existing function
     log_path = os.path.join(base_path, filename)
 
     if not os.path.exists(log_path):
@@ -309,13 +556,25 @@ def display_log_file(filename="cluster.log", max_lines=2000):
 # -----------------------------------------
 # Log File Viewer
 # -----------------------------------------
-with st.expander(" View Cluster Logs"):
-    log_filename = st.text_input("Log filename:", "cluster.log")
-    if st.button("Load Log"):
-        display_log_file(log_filename)
+@st.fragment
+def log_viewer():
+    """Log viewer widgets; typing a name or clicking Load Log reruns only this
+    fragment, not the metrics, gauges and charts above."""
+    with st.expander(" View Cluster Logs"):
+        log_filename = st.text_input("Log filename:", "cluster.log")
+        if st.button("Load Log"):
+            display_log_file(log_filename)
+
+log_viewer()
+
 
 
+# Raw Data (on demand) - limit rows to keep UI responsive
+@st.fragment
+def raw_data_viewer(data: pd.DataFrame):
+    """The table is only serialized when the box is ticked (a collapsed expander
+    still ships its contents); toggling reruns only this fragment."""
+    if st.checkbox(" Show raw filtered data (last 1000 rows)"):
+        st.dataframe(data.tail(1000), use_container_width=True)
 
-# Raw Data (collapsible) - limit rows to keep UI responsive
-with st.expander(" View Raw Filtered Data (last 1000 rows)", expanded=False):
-    st.dataframe(filtered_df.tail(1000), use_container_width=True)
+raw_data_viewer(filtered_df)